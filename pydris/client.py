@@ -1,35 +1,67 @@
 # pyright: strict
 from __future__ import annotations
-from aiohttp import ClientSession, ClientWebSocketResponse
-from asyncio import sleep, create_task, get_event_loop_policy
-from json import loads
+from aiohttp import ClientSession, ClientWebSocketResponse, TCPConnector
+from yarl import URL
+from asyncio import Task, sleep, create_task, get_event_loop_policy, set_event_loop_policy
+import logging
 import typing
 from importlib import import_module
 
+try:
+    from orjson import loads, dumps
+except ImportError:
+    from json import loads, dumps
+
 from .extensions import Extension
 from .models import MessagePayload, Message, MessageResponse
-from .typed_ws_msg import BaseTypedWSMessage
 from .commands import Command
 
 REST_URL = "https://eludris.tooty.xyz/"
 GATEWAY_URL = "wss://eludris.tooty.xyz/ws/"
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+_log = logging.getLogger(__name__)
 
 
 class Client:
     """A simple class that handles interfacing with the Eludris API."""
-    __slots__ = ("name", "rest_url", "gateway_url", "session", "listeners", "ws", "prefix", "commands", "extensions")
-    def __init__(self, name: str, rest_url: str = REST_URL, gateway_url: str = GATEWAY_URL, prefix: typing.Optional[str] = None) -> None:
+    __slots__ = ("name", "rest_url", "gateway_url", "_session", "listeners", "ws", "_prefix", "_plen", "commands", "extensions", "use_uvloop", "_messages_url", "_tasks", "prefix_listeners", "_prefix_listener_lengths")
+    def __init__(self, name: str, rest_url: str = REST_URL, gateway_url: str = GATEWAY_URL, prefix: typing.Optional[str] = None, use_uvloop: bool = True) -> None:
         self.name = name
         self.rest_url = rest_url
         self.gateway_url = gateway_url
         self.prefix = prefix
+        self.use_uvloop = use_uvloop
         self.commands: dict[str, Command] = {}
         self.extensions: list[Extension] = []
 
-        self.session = ClientSession()
         self.listeners: list[tuple[typing.Callable[[Message], bool], typing.Callable[[Message], typing.Coroutine[typing.Any, typing.Any, typing.Any]]]] = []
+        self.prefix_listeners: dict[str, list[typing.Callable[[Message], typing.Coroutine[typing.Any, typing.Any, typing.Any]]]] = {}
+        self._prefix_listener_lengths: list[int] = []
 
+        self._session: typing.Optional[ClientSession] = None
         self.ws: ClientWebSocketResponse
+        self._messages_url: URL
+        # The event loop only keeps weak references to tasks, so running ones are held here
+        self._tasks: set[Task[typing.Any]] = set()
+
+    @property
+    def prefix(self) -> typing.Optional[str]:
+        """The prefix commands are invoked with."""
+        return self._prefix
+
+    @prefix.setter
+    def prefix(self, prefix: typing.Optional[str]):
+        self._prefix = prefix
+        self._plen = len(prefix) if prefix is not None else 0
+
+    @property
+    def session(self) -> ClientSession:
+        """The client's HTTP session, created on first use so it belongs to the loop that's running."""
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(connector=TCPConnector(limit_per_host=32, ttl_dns_cache=300, enable_cleanup_closed=True))
+            self._messages_url = URL(self.rest_url + "messages/")
+        return self._session
 
     async def handle_heartbeat(self):
         """A simple function that send's a ping to the Eludris gateway every 20 seconds."""
@@ -41,35 +73,91 @@ class Client:
         """A function that initialises the handler's connection to the Eludris gateway."""
         # Here we face the minor issue of aiohttp websockets being not fully typed :/
         self.ws = await self.session.ws_connect(self.gateway_url) # type: ignore
-        create_task(self.handle_heartbeat())
-        async for payload in self.ws:
-            wsmsg: BaseTypedWSMessage[typing.Any] = BaseTypedWSMessage.convert_from_untyped(payload)
-            data = typing.cast(str, wsmsg.data)
-            msg: MessagePayload = loads(data)
-            create_task(self.handle_message(msg))
+        heartbeat = create_task(self.handle_heartbeat())
+        try:
+            async for payload in self.ws:
+                try:
+                    msg: MessagePayload = loads(payload.data)
+                    self.handle_message(msg)
+                except Exception:
+                    _log.exception("Ignoring exception while handling a gateway message")
+        finally:
+            heartbeat.cancel()
+
+    def _spawn(self, coro: typing.Coroutine[typing.Any, typing.Any, typing.Any]) -> Task[typing.Any]:
+        """Runs a coroutine in a task which the client keeps a reference to until it's done."""
+        task = create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
 
     def run(self):
-        """Starts the client synchronously."""
+        """Starts the client synchronously, using uvloop if it's installed and enabled."""
+        if self.use_uvloop:
+            try:
+                import uvloop
+            except ImportError:
+                pass
+            else:
+                set_event_loop_policy(uvloop.EventLoopPolicy())
         try:
             get_event_loop_policy().get_event_loop().run_until_complete(self.start())
         except KeyboardInterrupt:
             return
 
-    async def handle_message(self, message: MessagePayload):
-        """A function that handles messages getting received."""
-        msg = Message.from_dict(message)
-        for pred, listener in self.listeners:
-            if pred(msg):
-                await listener(msg)
+    def handle_message(self, message: MessagePayload):
+        """A function that handles messages getting received.
+
+        Matching is done inline, only the commands and listeners that match get a task to run in.
+        """
+        msg: typing.Optional[Message] = None
+        prefix = self._prefix
+        content = message["content"]
+        if prefix is not None and content.startswith(prefix):
+            parts = content[self._plen:].split(None, 1)
+            name = parts[0] if parts else ""
+            tail = parts[1] if len(parts) > 1 else ""
+            if (command := self.commands.get(name)) is not None:
+                msg = Message.from_dict(message)
+                self._spawn(command.invoke(msg, tail))
+            for ext in self.extensions:
+                if name in ext.commands:
+                    if msg is None:
+                        msg = Message.from_dict(message)
+                    self._spawn(ext.invoke(self, msg, name, tail))
+        for length in self._prefix_listener_lengths:
+            if length > len(content):
+                break
+            if (listeners := self.prefix_listeners.get(content[:length])) is not None:
+                if msg is None:
+                    msg = Message.from_dict(message)
+                for listener in listeners:
+                    self._spawn(listener(msg))
+        if self.listeners:
+            if msg is None:
+                msg = Message.from_dict(message)
+            for pred, listener in self.listeners:
+                try:
+                    matched = pred(msg)
+                except Exception:
+                    _log.exception("Ignoring exception in the predicate of listener %r", listener)
+                    continue
+                if matched:
+                    self._spawn(listener(msg))
+
+    async def send_payload(self, payload: MessagePayload) -> MessageResponse:
+        """A simple function that sends a raw message payload to Eludris."""
+        session = self.session
+        async with session.post(self._messages_url, data=dumps(payload), headers=JSON_HEADERS) as response:
+            return loads(await response.read())
 
     async def send_message(self, message: Message) -> MessageResponse:
         """A simple function that sends a message object to Eludris."""
-        async with self.session.post(self.rest_url+"messages/", json=message.to_dict()) as response:
-            return await response.json()
+        return await self.send_payload(message.to_dict())
 
     async def send(self, content: str) -> MessageResponse:
         """A simple function that sends a message with the bot name and specified content to Eludris."""
-        return await self.send_message(Message(self.name, content))
+        return await self.send_payload({"author": self.name, "content": content})
 
     def listen(self, pred: typing.Callable[[Message], bool]):
         """A simple decorator to register a listener for a message."""
@@ -78,18 +166,25 @@ class Client:
             return listener
         return inner
 
+    def listen_prefix(self, prefix: str):
+        """A simple decorator to register a listener for messages starting with a string.
+
+        This is equivalent to ``listen(lambda m: m.content.startswith(prefix))`` but all prefix
+        listeners are matched with a handful of dict lookups instead of a predicate each.
+        """
+        def inner(listener: typing.Callable[[Message], typing.Coroutine[typing.Any, typing.Any, typing.Any]]):
+            self.prefix_listeners.setdefault(prefix, []).append(listener)
+            if len(prefix) not in self._prefix_listener_lengths:
+                self._prefix_listener_lengths.append(len(prefix))
+                self._prefix_listener_lengths.sort()
+            return listener
+        return inner
+
     def add_command(self, command: Command):
         """Adds a command to the bot, consider using the @command decorator instead."""
-        prefix: str
         if self.prefix is None:
             raise ValueError("Prefix can't be None")
-        else:
-            prefix = self.prefix
-        for i in command.names:
-            if i in self.commands:
-                raise ValueError("A command with this name already exists")
-            self.commands[i] = command
-        self.listeners.append((lambda m: m.content.startswith(prefix) and m.content[len(prefix):].split()[0] in command.names, lambda m: command.invoke(m, prefix)))
+        command.register(self.commands)
 
     def command(self, name: typing.Optional[str] = None, aliases: typing.Optional[list[str]] = None, description: typing.Optional[str] = None):
         """A simple decorator that adds a command to the bot."""
@@ -104,10 +199,6 @@ class Client:
         mod = import_module(path)
         if (ext := getattr(mod, "ext", None)) is None:
             raise ValueError("ext object not found, maybe you named it something different?")
-        prefix: str
         if self.prefix is None:
             raise ValueError("Prefix can't be None")
-        else:
-            prefix = self.prefix
         self.extensions.append(ext)
-        self.listeners.append((lambda m: m.content.startswith(prefix), lambda m: ext.invoke(self, m, prefix)))
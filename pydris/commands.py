@@ -1,5 +1,7 @@
 # pyright: strict
 from __future__ import annotations
+import re
+import sys
 import typing
 
 
@@ -9,6 +11,9 @@ if typing.TYPE_CHECKING:
 
 PT = typing.TypeVar("PT")
 
+_TRUE_VALUES = frozenset({"yes", "y", "true", "t", "1", ""})
+_FALSE_VALUES = frozenset({"no", "n", "false", "f", "0"})
+
 class Param(typing.Generic[PT]):
     """A simple class which represents a parameter."""
     __slots__ = ("name", "parser", "default", "required", "multiple", "short", "flag")
@@ -29,10 +34,10 @@ class Param(typing.Generic[PT]):
             raise ValueError("Parameters with short names must be glags")
 
     def parse(self, args: list[str]) -> PT | list[PT]:
-        parsed: list[list[PT]] = []
+        parse = self.parser.parse
+        matches: list[PT] = []
         for i in args:
-            parsed.append(self.parser.parse(i))
-        matches = [i for j in parsed for i in j]
+            matches.extend(parse(i))
         if len(matches) == 0:
             if self.required:
                 raise ValueError(f"Parameter {self.name} is required")
@@ -72,9 +77,10 @@ class NumberParser:
 
 class BoolParser:
     def parse(self, arg: str) -> list[bool]:
-        if arg.lower() in ["yes", "y", "true", "t", "1", ""]:
+        arg = arg.lower()
+        if arg in _TRUE_VALUES:
             found = True
-        elif arg.lower() in ["no", "n", "false", "f", "0"]:
+        elif arg in _FALSE_VALUES:
             found = False
         else:
             raise ValueError("Value cannot be interpreted as a boolean")
@@ -82,15 +88,16 @@ class BoolParser:
 
 class Command:
     """A simple class which represents a command."""
-    __slots__ = ("prefix", "name", "description", "aliases", "names", "func", "args", "handler")
+    __slots__ = ("name", "description", "aliases", "names", "func", "args", "handler", "_params")
     def __init__(self, func: typing.Callable[..., typing.Coroutine[typing.Any, typing.Any, typing.Any]], name: typing.Optional[str] = None, aliases: typing.Optional[list[str]] = None, description: typing.Optional[str] = None):
-        self.name = name or func.__name__
+        self.name = sys.intern(name or func.__name__)
         self.description = description or func.__doc__
-        self.aliases = aliases if aliases is not None else []
+        self.aliases = [sys.intern(i) for i in aliases] if aliases is not None else []
         self.names = [self.name] + self.aliases
         self.func = func
         self.args: list[Param[typing.Any]] = []
         self.handler: typing.Optional[typing.Callable[[Message, Exception], typing.Coroutine[typing.Any, typing.Any, typing.Any]]] = None
+        self._params: typing.Optional[tuple[list[Param[typing.Any]], dict[str, Param[typing.Any]]]] = None
 
     @classmethod
     def command(cls, name: typing.Optional[str] = None, aliases: typing.Optional[list[str]] = None, description: typing.Optional[str] = None):
@@ -103,16 +110,33 @@ class Command:
         self.handler = func
         return func
 
-    def get_args(self, msg: Message, prefix: str) -> dict[str, typing.Any]:
-        invocation = prefix + msg.content[len(prefix):].split(" ", 1)[0]
-        args, kwargs = parse_content(msg.content[len(invocation):])
-        params: list[Param[typing.Any]] = []
-        kwparams: dict[str, Param[typing.Any]] = {}
-        for arg in self.args:
-            if arg.flag:
-                kwparams[arg.name] = arg
-            else:
-                params.append(arg)
+    def register(self, commands: dict[str, Command]):
+        """Adds the command to a mapping under all of its names, nothing is added if any of them is taken."""
+        if commands.keys() & self.names:
+            raise ValueError("A command with this name already exists")
+        commands.update(dict.fromkeys(self.names, self))
+
+    def add_param(self, param: Param[typing.Any]):
+        """Adds a parameter to the command, consider using the @param decorator instead."""
+        self.args.append(param)
+        self._params = None
+
+    def get_params(self) -> tuple[list[Param[typing.Any]], dict[str, Param[typing.Any]]]:
+        """Returns this command's positional parameters and its flags keyed by name."""
+        if self._params is None:
+            params: list[Param[typing.Any]] = []
+            kwparams: dict[str, Param[typing.Any]] = {}
+            for arg in self.args:
+                if arg.flag:
+                    kwparams[arg.name] = arg
+                else:
+                    params.append(arg)
+            self._params = (params, kwparams)
+        return self._params
+
+    def get_args(self, tail: str) -> dict[str, typing.Any]:
+        args, kwargs = parse_content(tail)
+        params, kwparams = self.get_params()
         passed_args: dict[str, typing.Any] = {}
         for (arg, param) in zip(args, params):
             passed_args[param.name] = param.parse([arg])
@@ -137,18 +161,18 @@ class Command:
                 raise ValueError("Not enough args")
         return passed_args
 
-    async def invoke(self, msg: Message, prefix: str):
+    async def invoke(self, msg: Message, tail: str):
         try:
-            await self.func(msg, **self.get_args(msg, prefix))
+            await self.func(msg, **self.get_args(tail))
         except Exception as e:
             if self.handler is not None:
                 await self.handler(msg, e)
             else:
                 raise
 
-    async def invoke_with_client(self, client: Client, msg: Message, prefix: str):
+    async def invoke_with_client(self, client: Client, msg: Message, tail: str):
         try:
-            await self.func(client, msg, **self.get_args(msg, prefix))
+            await self.func(client, msg, **self.get_args(tail))
         except Exception as e:
             if self.handler is not None:
                 await self.handler(msg, e)
@@ -158,72 +182,44 @@ class Command:
 
 def param(name: str, parser: Parser[typing.Any], required: typing.Optional[bool] = None, default: typing.Optional[typing.Any] = None, multiple: bool = False, short: typing.Optional[str] = None, flag: typing.Optional[bool] = None):
     def inner(cmd: Command):
-        cmd.args.append(Param(name, parser, required, default, multiple, short, flag))
+        cmd.add_param(Param(name, parser, required, default, multiple, short, flag))
         return cmd
     return inner
 
+_TOKEN = re.compile(r"""
+    --(?P<long>[^ "\\]+)                 # --name
+    | -(?P<short>[^ "\\-])               # -n, anything right after it is its value
+    | (?P<value>
+        (?:\\.|[^ "\\])*"(?:\\.|[^"\\])*"?  # a word ending in a quoted section, which may contain spaces
+        | (?:\\.|[^ "\\])+                # a plain word
+    )
+""", re.VERBOSE | re.DOTALL)
+_UNESCAPE = re.compile(r'\\(.)|"', re.DOTALL)
+
 def parse_content(content: str) -> tuple[list[str], dict[str, list[str]]]:
+    if "-" not in content and "\"" not in content and "\\" not in content:
+        return ([i for i in content.split(" ") if i], {})
+
     args: list[str] = []
     kwargs: dict[str, list[str]] = {}
-    quoted = False
-    escaped = False
-    dash = False
-    double_dash = False
-
-    value = ""
-    name = ""
-
-    for c in content:
-        if c == "\\" and not escaped:
-            escaped = True
-        elif escaped:
-            value += c
-            escaped = False
-        elif c == "\"" and not quoted:
-            quoted = True
-        elif c == "\"":
-            quoted = False
-            if name:
-                kwargs.setdefault(name, []).append(value)
-            elif value:
-                args.append(value)
-            name = ""
-            value = ""
-        elif c == "-" and not dash and value == "" and not quoted:
-            dash = True
-        elif c == "-" and not double_dash and value == "" and not quoted:
-            double_dash = True
-        elif double_dash and c != " ":
-            name += c
-        elif dash and c != " ":
-            name = c
-            dash = False
-        elif c == " ":
-            if double_dash and name == "":
-                args.append("--")
-            elif dash and name == "":
-                args.append("-")
-            if double_dash:
-                double_dash = False
-                dash = False
-            elif name and value == "":
-                continue
-            elif quoted:
-                value += c
-            else:
-                if name:
-                    kwargs.setdefault(name, []).append(value)
-                elif value:
-                    args.append(value)
-                name = ""
-                value = ""
-        else:
-            value += c
-
-    if name:
-        kwargs.setdefault(name, []).append(value)
-    elif value:
-        args.append(value)
+    flag: typing.Optional[str] = None
+
+    for match in _TOKEN.finditer(content):
+        value: typing.Optional[str] = match.group("value")
+        if value is None:
+            if flag is not None:
+                kwargs.setdefault(flag, []).append("")
+            flag = match.group("long") or match.group("short")
+            continue
+        if "\\" in value or "\"" in value:
+            value = _UNESCAPE.sub(r"\1", value)
+        if flag is not None:
+            kwargs.setdefault(flag, []).append(value)
+            flag = None
+        elif value:
+            args.append(value)
+
+    if flag is not None:
+        kwargs.setdefault(flag, []).append("")
 
     return (args, kwargs)
-
@@ -28,6 +28,7 @@ class Extension:
         client.load("ext") # a python dotpath
 
     """
+    __slots__ = ("name", "description", "commands")
     def __init__(self, name: str, description: typing.Optional[str] = None):
         self.name = name
         self.description = description
@@ -37,15 +38,12 @@ class Extension:
         """A simple decorator that adds a command to the extension."""
         def inner(func: typing.Callable[..., typing.Coroutine[typing.Any, typing.Any, typing.Any]]):
             command = Command(func, name, aliases, description)
-            for i in command.names:
-                if i in self.commands:
-                    raise ValueError("A command with this name already exists")
-                self.commands[i] = command
+            command.register(self.commands)
             return command
         return inner
 
-    async def invoke(self, client: Client, msg: Message, prefix: str):
-        cmd = msg.content[len(prefix):].split(" ", 1)[0]
+    async def invoke(self, client: Client, msg: Message, cmd: str, tail: str):
+        """Invokes the command named ``cmd`` with the arguments in ``tail``, both already split out of the message by the client."""
         if (command := self.commands.get(cmd)) is not None:
-            return await command.invoke_with_client(client, msg, prefix)
+            return await command.invoke_with_client(client, msg, tail)
 
@@ -12,15 +12,11 @@ DT = typing.TypeVar("DT")
 class BaseTypedWSMessage(typing.Generic[DT]):
     type: WSMsgType
     data: DT
-    extra: str
+    extra: typing.Optional[str]
 
     @classmethod
     def convert_from_untyped(cls: builtins.type[Self], msg: WSMessage) -> Self:
-        return cls(
-            typing.cast(WSMsgType, msg[0]),
-            typing.cast(DT, msg[1]),
-            typing.cast(str, msg[2]),
-        )
+        return cls(msg[0], msg[1], msg[2]) # pyright: ignore[reportUnknownArgumentType]
 
 
 TextTypedWSMessage = BaseTypedWSMessage[str]
@@ -36,11 +32,5 @@ def is_binary(base: BaseTypedWSMessage[typing.Any]) -> TypeGuard[BinaryTypedWSMe
 
 
 def convert_from_untyped(msg: WSMessage) -> BaseTypedWSMessage[typing.Any]:
-    base: BaseTypedWSMessage[typing.Any] = BaseTypedWSMessage.convert_from_untyped(msg)
-
-    if base.type == WSMsgType.TEXT:
-        return typing.cast(TextTypedWSMessage, base)
-    elif base.type == WSMsgType.BINARY:
-        return typing.cast(BinaryTypedWSMessage, base)
-    return base
+    return BaseTypedWSMessage[typing.Any].convert_from_untyped(msg)
 
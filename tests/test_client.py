@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+
+from pydris import Client, Command, Extension, Message
+
+
+def dispatch(client: Client, *contents: str):
+    async def inner():
+        for content in contents:
+            client.handle_message({"author": "someone", "content": content})
+        await asyncio.sleep(0)
+    asyncio.run(inner())
+
+
+def test_prefix_listener_runs_once_for_message_shorter_than_other_prefixes():
+    client = Client("bot")
+    seen: list[str] = []
+
+    @client.listen_prefix("hi")
+    async def hi(_: Message):
+        seen.append("hi")
+
+    @client.listen_prefix("hello")
+    async def hello(_: Message):
+        seen.append("hello")
+
+    dispatch(client, "hi", "hello there", "h")
+    assert seen == ["hi", "hello"]
+
+
+def test_raising_predicate_does_not_escape_handle_message():
+    client = Client("bot")
+    seen: list[str] = []
+
+    @client.listen(lambda m: m.content.split()[0] == "hey")
+    async def hey(_: Message):
+        seen.append("hey")
+
+    @client.listen(lambda _: True)
+    async def anything(msg: Message):
+        seen.append(msg.content)
+
+    dispatch(client, "", "hey you")
+    assert seen == ["", "hey", "hey you"]
+
+
+def test_commands_run_with_empty_prefix():
+    client = Client("bot", prefix="")
+    seen: list[str] = []
+
+    @client.command()
+    async def ping(_: Message):
+        seen.append("ping")
+
+    dispatch(client, "ping", "pong")
+    assert seen == ["ping"]
+
+
+def test_command_name_ends_at_any_whitespace():
+    client = Client("bot", prefix="!")
+    seen: list[str] = []
+
+    @client.command()
+    async def ping(msg: Message):
+        seen.append(msg.content)
+
+    dispatch(client, "!ping\nmore text", "!ping\tx", "!pingx")
+    assert seen == ["!ping\nmore text", "!ping\tx"]
+
+
+def test_session_is_created_on_first_use_and_reused():
+    async def inner():
+        client = Client("bot")
+        session = client.session
+        assert client.session is session
+        await session.close()
+        assert client.session is not session
+        await client.session.close()
+    asyncio.run(inner())
+
+
+def test_extension_commands_are_dispatched_from_commands_dict():
+    client = Client("bot", prefix="!")
+    ext = Extension("ext")
+    seen: list[str] = []
+
+    @ext.command()
+    async def foo(_: Client, msg: Message):
+        seen.append(msg.content)
+
+    async def bar(_: Client, msg: Message):
+        seen.append(msg.content)
+
+    ext.commands["bar"] = Command(bar)
+    client.extensions.append(ext)
+
+    dispatch(client, "!foo", "!bar x", "!baz")
+    assert seen == ["!foo", "!bar x"]
+
+
+def test_extension_commands_are_invoked_through_extension_invoke():
+    class LoggingExtension(Extension):
+        async def invoke(self, client: Client, msg: Message, cmd: str, tail: str):
+            seen.append(f"{cmd}:{tail}")
+            return await super().invoke(client, msg, cmd, tail)
+
+    client = Client("bot", prefix="!")
+    ext = LoggingExtension("ext")
+    seen: list[str] = []
+
+    @ext.command()
+    async def foo(_: Client, msg: Message):
+        seen.append(msg.content)
+
+    client.extensions.append(ext)
+
+    dispatch(client, "!foo a b", "!bar")
+    assert seen == ["foo:a b", "!foo a b"]
+
+
+def test_clashing_command_is_not_partially_registered():
+    client = Client("bot", prefix="!")
+
+    @client.command(aliases=["b"])
+    async def a(_: Message): ...
+
+    async def c(_: Message): ...
+
+    with pytest.raises(ValueError):
+        client.add_command(Command(c, aliases=["b"]))
+    assert set(client.commands) == {"a", "b"}
+
+
+def test_bad_frame_does_not_stop_the_gateway_loop():
+    class Frame:
+        def __init__(self, data: str):
+            self.data = data
+
+    class WebSocket:
+        def __init__(self, *frames: str):
+            self.frames = [Frame(f) for f in frames]
+
+        async def ping(self): ...
+
+        def __aiter__(self):
+            return self.gen()
+
+        async def gen(self):
+            for frame in self.frames:
+                yield frame
+
+    class Session:
+        closed = False
+
+        def __init__(self, ws: WebSocket):
+            self.ws = ws
+
+        async def ws_connect(self, _: str):
+            return self.ws
+
+    client = Client("bot", prefix="!")
+    seen: list[str] = []
+
+    @client.listen(lambda _: True)
+    async def anything(msg: Message):
+        seen.append(msg.content)
+
+    client._session = Session(WebSocket(  # type: ignore
+        '{"author": "someone"}',
+        '{"author": "someone", "content": null}',
+        'not json',
+        '{"author": "someone", "content": "hi"}',
+    ))
+
+    async def inner():
+        await client.start()
+        await asyncio.sleep(0)
+    asyncio.run(inner())
+    assert seen == ["hi"]
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import pytest
+
+from pydris.commands import parse_content
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("", ([], {})),
+    ("a  b", (["a", "b"], {})),
+    ('"a b" c', (["a b", "c"], {})),
+    ("a\\ b", (["a b"], {})),
+    ('"q\\"z"', (['q"z'], {})),
+    ('ab"cd ef"', (["abcd ef"], {})),
+    ('"ab"cd', (["ab", "cd"], {})),
+    ('""', ([], {})),
+    ("-b 9", ([], {"b": ["9"]})),
+    ("-b9", ([], {"b": ["9"]})),
+    ('-b "x y"', ([], {"b": ["x y"]})),
+    ('-b ""', ([], {"b": [""]})),
+    ("--name v", ([], {"name": ["v"]})),
+    ("--a-b v", ([], {"a-b": ["v"]})),
+    ("--name", ([], {"name": [""]})),
+    ("--name=v", ([], {"name=v": [""]})),
+    ('--name="x y"', ([], {"name=": ["x y"]})),
+    ("-b -c 1", ([], {"b": [""], "c": ["1"]})),
+    ("--x --y", ([], {"x": [""], "y": [""]})),
+    ("-b 1 -b 2", ([], {"b": ["1", "2"]})),
+    ("-", (["-"], {})),
+    ("--", (["--"], {})),
+    ("x -", (["x", "-"], {})),
+    ("- x", (["-", "x"], {})),
+    ("-- x", (["--", "x"], {})),
+    ("a-b", (["a-b"], {})),
+    # Malformed input the old state machine parsed differently, kept as intentional changes
+    ("-b-c", ([], {"b": [""], "c": [""]})),
+    ("-b--c", ([], {"b": [""], "c": [""]})),
+    ("-b-", ([], {"b": ["-"]})),
+    ("--ab\\ c", ([], {"ab": [" c"]})),
+    ('--a"b c"', ([], {"a": ["b c"]})),
+    ("-\\a", (["-a"], {})),
+    ('-"x y"', (["-x y"], {})),
+])
+def test_parse_content(content: str, expected: tuple[list[str], dict[str, list[str]]]):
+    assert parse_content(content) == expected